@@ -21,10 +21,48 @@ from board_util import (
     is_black_white_empty,
     coord_to_point,
     where1d,
+    where_bits,
     MAXSIZE,
     GO_POINT
 )
 
+"""
+Five in a row is tested after every move of every playout.
+_five_detector(NS) generates the bitboard test for boards with row
+stride NS, with the shifts of the four directions written into the code
+as constants, so it runs without a loop or attribute lookups.
+The generated functions are cached by stride.
+"""
+_FIVE_DETECTORS = {}
+
+_FIVE_TEMPLATE = """
+def has_five(bb):
+{body}    return False
+"""
+
+_FIVE_DIRECTION = """    pairs = bb & (bb >> {d})
+    if pairs & (pairs >> {d2}) & (bb >> {d4}):
+        return True
+"""
+
+
+def _five_detector(NS):
+    """
+    Return has_five(bb): whether bitboard bb has five stones in a row
+    on a board with row stride NS.
+    """
+    detector = _FIVE_DETECTORS.get(NS)
+    if detector is None:
+        body = "".join(
+            _FIVE_DIRECTION.format(d=d, d2=2 * d, d4=4 * d)
+            for d in (1, NS, NS + 1, NS - 1)
+        )
+        namespace = {}
+        exec(_FIVE_TEMPLATE.format(body=body), namespace)
+        detector = namespace["has_five"]
+        _FIVE_DETECTORS[NS] = detector
+    return detector
+
 """
 The GoBoard class implements a board and basic functions to play
 moves, check the end of the game, and count the acore at the end.
@@ -33,19 +71,33 @@ For many more utility functions, see the GoBoardUtil class in board_util.py.
 
 The board is stored as a one-dimensional array of GO_POINT in self.board.
 See GoBoardUtil.coord_to_point for explanations of the array encoding.
+The stones of each color are also kept as bitboards in self.black_bb and
+self.white_bb: bit p is set if there is a stone of that color on point p.
+Thanks to the BORDER padding, a line of stones in direction d is a run of
+bits with stride d, for d in self._DIRS.
 """
 class GoBoard(object):
+    # rows, cols and diags, shared by all boards of a size
+    _LINES = {}
+    # start state of an empty board, by size, see _make_template
+    _TEMPLATES = {}
+    # scratch buffers, by size, see _allocate_scratch
+    _SCRATCH = {}
+
     def __init__(self, size):
         """
         Creates a Go board of given size
         """
         assert 2 <= size <= MAXSIZE
         self.reset(size)
-        self.calculate_rows_cols_diags()
 
     def calculate_rows_cols_diags(self):
         if self.size < 5:
             return
+        lines = GoBoard._LINES.get(self.size)
+        if lines is not None:
+            self.rows, self.cols, self.diags = lines
+            return
         # precalculate all rows, cols, and diags for 5-in-a-row detection
         self.rows = []
         self.cols = []
@@ -102,6 +154,7 @@ class GoBoard(object):
         assert len(self.rows) == self.size
         assert len(self.cols) == self.size
         assert len(self.diags) == (2 * (self.size - 5) + 1) * 2
+        GoBoard._LINES[self.size] = (self.rows, self.cols, self.diags)
 
     def reset(self, size):
         """
@@ -110,25 +163,80 @@ class GoBoard(object):
         self.size = size
         self.NS = size + 1
         self.WE = 1
+        self._DIRS = (self.WE, self.NS, self.NS + 1, self.NS - 1)
+        # self._has_five(bb): whether bitboard bb has five in a row
+        self._has_five = _five_detector(self.NS)
+        # offsets of the four neighbors and the four diagonal neighbors
+        self._NBS = (-1, 1, -self.NS, self.NS)
+        self._DIAG = (-self.NS - 1, -self.NS + 1, self.NS - 1, self.NS + 1)
         self.ko_recapture = None
         self.last_move = None
         self.last2_move = None
         self.current_player = BLACK
+        self._history = []
+        self._threat_cache = None
         self.maxpoint = size * size + 3 * (size + 1)
-        self.board = np.full(self.maxpoint, BORDER, dtype=GO_POINT)
-        self._initialize_empty_points(self.board)
+        template = GoBoard._TEMPLATES.get(size)
+        if template is None:
+            template = self._make_template()
+            GoBoard._TEMPLATES[size] = template
+        board, self._points_bb, self._around = template
+        self.board = board.copy()
+        self._allocate_scratch()
+        self.black_bb = 0
+        self.white_bb = 0
         self.calculate_rows_cols_diags()
 
+    def _make_template(self):
+        """
+        Build the start state shared by all boards of this size:
+        the empty board array, the bitboard of all points on the board,
+        and for each point the bitboard of the points up to four steps
+        away from it in the four directions, see detect_five_around.
+        """
+        board = np.full(self.maxpoint, BORDER, dtype=GO_POINT)
+        self._initialize_empty_points(board)
+        empties = where1d(board == EMPTY).tolist()
+        points_bb = 0
+        around = [0] * self.maxpoint
+        for point in empties:
+            points_bb |= 1 << point
+            mask = 1 << point
+            for d in self._DIRS:
+                for step in (d, -d):
+                    p = point + step
+                    for _ in range(4):
+                        if board[p] == BORDER:
+                            break
+                        mask |= 1 << p
+                        p += step
+            around[point] = mask
+        return board, points_bb, around
+
+    def _allocate_scratch(self):
+        """
+        Get the scratch buffers of connected_component.
+        They are shared by all boards of the same size: connected_component
+        clears its markers before returning, so no state is left behind
+        between calls.
+        """
+        scratch = GoBoard._SCRATCH.get(self.size)
+        if scratch is None:
+            scratch = (np.zeros(self.maxpoint, dtype=bool),
+                       np.empty(self.maxpoint, dtype=np.int32))
+            GoBoard._SCRATCH[self.size] = scratch
+        self._marker, self._stack = scratch
+
     def copy(self):
-        b = GoBoard(self.size)
-        assert b.NS == self.NS
-        assert b.WE == self.WE
-        b.ko_recapture = self.ko_recapture
-        b.last_move = self.last_move
-        b.last2_move = self.last2_move
-        b.current_player = self.current_player
-        assert b.maxpoint == self.maxpoint
-        b.board = np.copy(self.board)
+        """
+        Return an independent copy of the board.
+        The board array and move history are copied,
+        the per-size data and scratch buffers are shared.
+        """
+        b = GoBoard.__new__(GoBoard)
+        b.__dict__.update(self.__dict__)
+        b.board = self.board.copy()
+        b._history = list(self._history)
         return b
 
     def get_color(self, point):
@@ -140,12 +248,13 @@ class GoBoard(object):
     def is_legal(self, point, color):
         """
         Check whether it is legal for color to play on point
-        This method tries to play the move on a temporary copy of the board.
-        This prevents the board from being modified by the move
+        In Gomoku there are no captures, suicide or ko, so a move is legal
+        if it is a pass or the point is empty. This is the same check
+        play_move makes, without changing the board.
         """
-        board_copy = self.copy()
-        can_play_move = board_copy.play_move(point, color)
-        return can_play_move
+        return point == PASS or (
+            is_black_white(color) and self.board[point] == EMPTY
+        )
 
     def get_empty_points(self):
         """
@@ -187,7 +296,8 @@ class GoBoard(object):
         opp_color = GoBoardUtil.opponent(color)
         false_count = 0
         at_edge = 0
-        for d in self._diag_neighbors(point):
+        for offset in self._DIAG:
+            d = point + offset
             if self.board[d] == BORDER:
                 at_edge = 1
             elif self.board[d] == opp_color:
@@ -199,8 +309,8 @@ class GoBoard(object):
         check whether empty point is surrounded by stones of color
         (or BORDER) neighbors
         """
-        for nb in self._neighbors(point):
-            nb_color = self.board[nb]
+        for offset in self._NBS:
+            nb_color = self.board[point + offset]
             if nb_color != BORDER and nb_color != color:
                 return False
         return True
@@ -208,9 +318,9 @@ class GoBoard(object):
     def _has_liberty(self, block):
         """
         Check if the given block has any liberty.
-        block is a numpy boolean array
+        block is a list of points, as returned by connected_component
         """
-        for stone in where1d(block):
+        for stone in block:
             empty_nbs = self.neighbors_of_color(stone, EMPTY)
             if empty_nbs:
                 return True
@@ -219,8 +329,7 @@ class GoBoard(object):
     def _block_of(self, stone):
         """
         Find the block of given stone
-        Returns a board of boolean markers which are set for
-        all the points in the block
+        Returns the list of all the points in the block
         """
         color = self.get_color(stone)
         assert is_black_white(color)
@@ -229,20 +338,30 @@ class GoBoard(object):
     def connected_component(self, point):
         """
         Find the connected component of the given point.
+        Returns the list of its points.
+        Uses the preallocated self._marker and self._stack, and only
+        clears the markers it has set.
         """
-        marker = np.full(self.maxpoint, False, dtype=bool)
-        pointstack = [point]
+        marker = self._marker
+        pointstack = self._stack
         color = self.get_color(point)
         assert is_black_white_empty(color)
         marker[point] = True
-        while pointstack:
-            p = pointstack.pop()
+        visited = [point]
+        pointstack[0] = point
+        top = 1
+        while top:
+            top -= 1
+            p = pointstack[top]
             neighbors = self.neighbors_of_color(p, color)
             for nb in neighbors:
                 if not marker[nb]:
                     marker[nb] = True
-                    pointstack.append(nb)
-        return marker
+                    visited.append(nb)
+                    pointstack[top] = nb
+                    top += 1
+        marker[visited] = False
+        return visited
 
     def _detect_and_process_capture(self, nb_point):
         """
@@ -255,8 +374,11 @@ class GoBoard(object):
         single_capture = None
         opp_block = self._block_of(nb_point)
         if not self._has_liberty(opp_block):
-            captures = list(where1d(opp_block))
+            captures = opp_block
             self.board[captures] = EMPTY
+            for stone in captures:
+                self.black_bb &= ~(1 << int(stone))
+                self.white_bb &= ~(1 << int(stone))
             if len(captures) == 1:
                 single_capture = nb_point
         return single_capture
@@ -269,6 +391,9 @@ class GoBoard(object):
         assert is_black_white(color)
         # Special cases
         if point == PASS:
+            self._history.append(
+                (point, self.last_move, self.last2_move, self.current_player)
+            )
             self.ko_recapture = None
             self.current_player = GoBoardUtil.opponent(color)
             self.last2_move = self.last_move
@@ -282,7 +407,14 @@ class GoBoard(object):
         # General case: deal with captures, suicide, and next ko point
         # opp_color = GoBoardUtil.opponent(color)
         # in_enemy_eye = self._is_surrounded(point, opp_color)
+        self._history.append(
+            (point, self.last_move, self.last2_move, self.current_player)
+        )
         self.board[point] = color
+        if color == BLACK:
+            self.black_bb |= 1 << int(point)
+        else:
+            self.white_bb |= 1 << int(point)
         # single_captures = []
         # neighbors = self._neighbors(point)
         # for nb in neighbors:
@@ -302,26 +434,40 @@ class GoBoard(object):
         self.last_move = point
         return True
 
+    def undo_move(self):
+        """
+        Take back the last move made with play_move.
+        Restores the stone, the player to move and the last moves.
+        """
+        point, self.last_move, self.last2_move, self.current_player = \
+            self._history.pop()
+        if point != PASS:
+            self.board[point] = EMPTY
+            self.black_bb &= ~(1 << int(point))
+            self.white_bb &= ~(1 << int(point))
+
     def neighbors_of_color(self, point, color):
         """ List of neighbors of point of given color """
+        board = self.board
         nbc = []
-        for nb in self._neighbors(point):
-            if self.get_color(nb) == color:
+        for offset in self._NBS:
+            nb = point + offset
+            if board[nb] == color:
                 nbc.append(nb)
         return nbc
 
     def _neighbors(self, point):
-        """ List of all four neighbors of the point """
-        return [point - 1, point + 1, point - self.NS, point + self.NS]
+        """ Tuple of all four neighbors of the point """
+        return (point - 1, point + 1, point - self.NS, point + self.NS)
 
     def _diag_neighbors(self, point):
-        """ List of all four diagonal neighbors of point """
-        return [
+        """ Tuple of all four diagonal neighbors of point """
+        return (
             point - self.NS - 1,
             point - self.NS + 1,
             point + self.NS - 1,
             point + self.NS + 1,
-        ]
+        )
 
     def last_board_moves(self):
         """
@@ -340,20 +486,142 @@ class GoBoard(object):
         Returns BLACK or WHITE if any five in a row is detected for the color
         EMPTY otherwise.
         """
-        for r in self.rows:
-            result = self.has_five_in_list(r)
-            if result != EMPTY:
-                return result
-        for c in self.cols:
-            result = self.has_five_in_list(c)
-            if result != EMPTY:
-                return result
-        for d in self.diags:
-            result = self.has_five_in_list(d)
-            if result != EMPTY:
-                return result
+        black = self._has_five(self.black_bb)
+        white = self._has_five(self.white_bb)
+        if black and white:
+            # report the five that the scan of the rows, cols and diags
+            # reaches first, as the line by line version did
+            for line in self.rows + self.cols + self.diags:
+                result = self.has_five_in_list(line)
+                if result != EMPTY:
+                    return result
+        if black:
+            return BLACK
+        if white:
+            return WHITE
         return EMPTY
 
+    def detect_five_around(self, point):
+        """
+        Returns the color of the stone on point if it is part of five in
+        a row, EMPTY otherwise.
+        Only the lines through point are checked, so after a move this
+        finds a new five in a row without scanning the whole board.
+        """
+        color = self.board[point]
+        if color == BLACK:
+            bb = self.black_bb
+        elif color == WHITE:
+            bb = self.white_bb
+        else:
+            return EMPTY
+        # A line of five that does not go through point has at most one
+        # point in common with each of the four lines through it, so
+        # every five found in the masked bitboard goes through point.
+        if self._has_five(bb & self._around[point]):
+            return color
+        return EMPTY
+
+    def _threats(self, bb):
+        """
+        Scan all lines for the stones in bitboard bb.
+        Returns two bitboards of empty points:
+        - points that complete five in a row: in a window of five points,
+          the other four are stones of bb
+        - points that make an open four: in a window of six points,
+          both ends are empty and the other four inner points are stones
+        """
+        empty = self._points_bb & ~(self.black_bb | self.white_bb)
+        fives = 0
+        open_fours = 0
+        for d in self._DIRS:
+            stones = [bb >> (k * d) for k in range(6)]
+            spaces = [empty >> (k * d) for k in range(6)]
+            for k in range(5):
+                window = spaces[k]
+                for j in range(5):
+                    if j != k:
+                        window &= stones[j]
+                fives |= window << (k * d)
+            ends = spaces[0] & spaces[5]
+            for k in range(1, 5):
+                window = ends & spaces[k]
+                for j in range(1, 5):
+                    if j != k:
+                        window &= stones[j]
+                open_fours |= window << (k * d)
+        return fives, open_fours
+
+    def _block_four_points(self, bb):
+        """
+        Bitboard of the points BlockOpenFour returns for the stones in bb.
+        For an empty point i and a direction d, let the stones of bb next
+        to i form a run of a points after i and b points before it, with
+        a + b == 3, so that i completes a four. The run ends at the points
+        A = i + (a + 1) * d and B = i - (b + 1) * d.
+        - If A and B are both empty, i is included, and for a == 2 also
+          A and B.
+        - If only one of A and B is empty, i is included together with
+          i + 5 * d when a == 3, or with i - 5 * d when a <= 1,
+          provided that point is empty as well.
+        """
+        empty = self._points_bb & ~(self.black_bb | self.white_bb)
+        not_bb = ((1 << self.maxpoint) - 1) & ~bb
+
+        def shifted(x, d):
+            """ bit i of shifted(x, d)[5 + k] is bit i + k * d of x """
+            return [x << (-k * d) if k < 0 else x >> (k * d)
+                    for k in range(-5, 6)]
+
+        result = 0
+        for d in self._DIRS:
+            stones = shifted(bb, d)
+            spaces = shifted(empty, d)
+            others = shifted(not_bb, d)
+            for a in range(4):
+                b = 3 - a
+                run = spaces[5] & others[5 + a + 1] & others[5 - b - 1]
+                for k in range(1, a + 1):
+                    run &= stones[5 + k]
+                for k in range(1, b + 1):
+                    run &= stones[5 - k]
+                end_a = spaces[5 + a + 1]
+                end_b = spaces[5 - b - 1]
+                both = run & end_a & end_b
+                result |= both
+                if a == 2:
+                    result |= (both << (3 * d)) | (both >> (2 * d))
+                one = run & (end_a ^ end_b)
+                if a == 3:
+                    one &= spaces[10]
+                    result |= one | (one << (5 * d))
+                elif a <= 1:
+                    one &= spaces[0]
+                    result |= one | (one >> (5 * d))
+        return result
+
+    def _own_threats(self):
+        """
+        _threats for the player to move. Win and OpenFour both need it for
+        the same position, so the last result is kept in
+        self._threat_cache together with the position it belongs to.
+        """
+        key = (self.black_bb, self.white_bb, self.current_player)
+        if self._threat_cache is not None and self._threat_cache[0] == key:
+            return self._threat_cache[1]
+        own, opp = self._own_and_opponent_bb()
+        threats = self._threats(own)
+        self._threat_cache = (key, threats)
+        return threats
+
+    def _own_and_opponent_bb(self):
+        """
+        Bitboards of the player to move and of the opponent
+        """
+        if self.current_player == BLACK:
+            return self.black_bb, self.white_bb
+        return self.white_bb, self.black_bb
+
     def has_five_in_list(self, list):
         """
         Returns BLACK or WHITE if any five in a rows exist in the list.
@@ -370,332 +638,16 @@ class GoBoard(object):
             if counter == 5 and prev != EMPTY:
                 return prev
         return EMPTY
-    def checkrow(self, start,color):
-        checkColor = self.board[start]
-        samecolor = 1
-        space = 0
-        start1 = start
-        while True:
-            start += 1
-            if self.board[start] == color:
-                samecolor += 1
-            else:
-                if self.board[start] == EMPTY:
-                    space += 1
-                break
-        while True:
-            start1 -= 1
-            if self.board[start1] == color:
-                samecolor += 1
-            else:
-                if self.board[start1] == EMPTY:
-                    space += 1
-                break
-        return samecolor, space
-    def checkcol(self, start,color):
-        checkColor = self.board[start]
-        samecolor = 1
-        space = 0
-        start1 = start
-        while True:
-            start += self.NS
-            if self.board[start] == color:
-                samecolor += 1
-            else:
-                if self.board[start] == EMPTY:
-                    space += 1
-                break
-        while True:
-            start1 -= self.NS
-            if self.board[start1] == color:
-                samecolor += 1
-            else:
-                if self.board[start1] == EMPTY:
-                    space += 1
-                break
-        return samecolor, space
-    def checkd1(self, start,color):
-        checkColor = self.board[start]
-        samecolor = 1
-        space = 0
-        start1 = start
-        while True:
-            start += int(self.NS +1)
-            if self.board[start] == color:
-                samecolor += 1
-            else:
-                if self.board[start] == EMPTY:
-                    space += 1
-                break
-        while True:
-            start1 -= int(self.NS + 1)
-            if self.board[start1] == color:
-                samecolor += 1
-            else:
-                if self.board[start1] == EMPTY:
-                    space += 1
-                break
-        return samecolor, space
-    def checkd2(self, start,color):
-        checkColor = self.board[start]
-        samecolor = 1
-        space = 0
-        start1 = start
-        while True:
-            start += int(self.NS -1)
-            if self.board[start] == color:
-                samecolor += 1
-            else:
-                if self.board[start] == EMPTY:
-                    space += 1
-                break
-        while True:
-            start1 -= int(self.NS - 1)
-            if self.board[start1] == color:
-                samecolor += 1
-            else:
-                if self.board[start1] == EMPTY:
-                    space += 1
-                break
-        return samecolor, space
-    def checkrow2(self, start,color):
-        checkColor = self.board[start]
-        samecolor = 1
-        space = 0
-        start1 = start
-        d = 0
-        s1 = -1
-        s2 = -1
-        while True:
-            start += 1
-            if self.board[start] == color:
-                samecolor += 1
-                d = 1
-            else:
-                if self.board[start] == EMPTY:
-                    space += 1
-                    s1 = start
-                break
-        while True:
-            start1 -= 1
-            if self.board[start1] == color:
-                if d == 1:
-                    d = 0
-                else:
-                    d = -1
-                samecolor += 1
-            else:
-                if self.board[start1] == EMPTY:
-                    space += 1
-                    s2 = start1
-                break
-        return samecolor, space, d, s1, s2
-    def checkcol2(self, start,color):
-        checkColor = self.board[start]
-        samecolor = 1
-        space = 0
-        start1 = start
-        d = 0
-        s1 = -1
-        s2 = -1
-        while True:
-            start += self.NS
-            if self.board[start] == color:
-                d = 1
-                samecolor += 1
-            else:
-                if self.board[start] == EMPTY:
-                    space += 1
-                    s1 = start
-                break
-        while True:
-            start1 -= self.NS
-            if self.board[start1] == color:
-                if d == 1:
-                    d = 0
-                else:
-                    d = -1
-                samecolor += 1
-            else:
-                if self.board[start1] == EMPTY:
-                    space += 1
-                    s2 = start1
-                break
-        return samecolor, space, d, s1, s2
-    def checkd12(self, start,color):
-        checkColor = self.board[start]
-        samecolor = 1
-        space = 0
-        start1 = start
-        d = 0
-        s1 = -1
-        s2 = -1
-        while True:
-            start += int(self.NS +1)
-            if self.board[start] == color:
-                samecolor += 1
-                d = 1
-            else:
-                if self.board[start] == EMPTY:
-                    space += 1
-                    s1 = start
-                break
-        while True:
-            start1 -= int(self.NS + 1)
-            if self.board[start1] == color:
-                if d == 1:
-                    d = 0
-                else:
-                    d = -1
-                samecolor += 1
-            else:
-                if self.board[start1] == EMPTY:
-                    space += 1
-                    s2 = start1
-                break
-        return samecolor, space, d, s1, s2
-    def checkd22(self, start,color):
-        checkColor = self.board[start]
-        samecolor = 1
-        space = 0
-        start1 = start
-        d = 0
-        s1 = -1
-        s2 = -1
-        while True:
-            start += int(self.NS -1)
-            if self.board[start] == color:
-                samecolor += 1
-                d = 1
-            else:
-                if self.board[start] == EMPTY:
-                    space += 1
-                    s1 = start
-                break
-        while True:
-            start1 -= int(self.NS - 1)
-            if self.board[start1] == color:
-                if d == 1:
-                    d = 0
-                else:
-                    d = -1
-                samecolor += 1
-            else:
-                if self.board[start1] == EMPTY:
-                    space += 1
-                    s2 = start1
-                break
-        return samecolor, space, d, s1, s2
     def Win(self):
-        move_list = []
-        color = self.current_player
-        moves = where1d(self.board == EMPTY)
-        for i in moves:
-            rowc,rows = self.checkrow(i,color)
-            colc,cols = self.checkcol(i,color)
-            d1c,d1s = self.checkd1(i,color)
-            d2c,d2s = self.checkd2(i,color)
-            if rowc>=5 or colc >= 5 or d1c >= 5 or d2c >= 5:
-                move_list.append(i)
-        return move_list
+        fives, open_fours = self._own_threats()
+        return where_bits(fives)
     def BlockWin(self):
-        color = WHITE + BLACK - self.current_player
-        moves = where1d(self.board == EMPTY)
-        move_list = []
-        for i in moves:
-            rowc,rows = self.checkrow(i,color)
-            colc,cols = self.checkcol(i,color)
-            d1c,d1s = self.checkd1(i,color)
-            d2c,d2s = self.checkd2(i,color)
-            if rowc>=5 or colc >= 5 or d1c >= 5 or d2c >= 5:
-                move_list.append(i)
-        return move_list
+        own, opp = self._own_and_opponent_bb()
+        fives, open_fours = self._threats(opp)
+        return where_bits(fives)
     def OpenFour(self):
-        color = self.current_player
-        moves = where1d(self.board == EMPTY)
-        move_list = []
-        for i in moves:
-            rowc,rows = self.checkrow(i,color)
-            colc,cols = self.checkcol(i,color)
-            d1c,d1s = self.checkd1(i,color)
-            d2c,d2s = self.checkd2(i,color)
-            if rowc ==4 and rows == 2:
-                move_list.append(i)
-            elif colc ==4 and cols == 2:
-                move_list.append(i)
-            elif d1c ==4 and d1s == 2:
-                move_list.append(i)
-            elif d2c ==4 and d2s ==2:
-                move_list.append(i)
-        return move_list
+        fives, open_fours = self._own_threats()
+        return where_bits(open_fours)
     def BlockOpenFour(self):
-        color = WHITE + BLACK - self.current_player
-        moves = where1d(self.board == EMPTY)
-        move_list = []
-        for i in moves:
-            rowc,rows,rd, rs1,rs2 = self.checkrow2(i,color)
-            colc,cols,cd, cs1, cs2= self.checkcol2(i,color)
-            d1c,d1s,d1, ds1, ds2 = self.checkd12(i,color)
-            d2c,d2s,d2, d21, d22 = self.checkd22(i,color)
-
-
-            if rowc ==4 and rows == 1:
-                if rd == 1 and self.board[i+5] == 0:
-                    move_list.append(i+5)
-                    move_list.append(i)
-                elif rd == -1 and self.board[i-5] == 0:
-                    move_list.append(i+5)
-                    move_list.append(i)
-            if colc ==4 and cols == 1:
-                if cd == 1:
-                    if self.board[i+5*self.NS] == 0:
-                        move_list.append(i+5*self.NS)
-                        move_list.append(i)
-                elif cd == -1:
-                    if self.board[i-5*self.NS] == 0:
-                        move_list.append(i-5*self.NS)
-                        move_list.append(i)
-            if d1c ==4 and d1s == 1:
-                if d1 == 1:
-                    if self.board[i+5*(self.NS+1)] == 0:
-                        move_list.append(i+5*(self.NS+1))
-                        move_list.append(i)
-                elif d1 == -1:
-                    if self.board[i-5*(self.NS+1)] == 0:
-                        move_list.append(i-5*(self.NS+1))
-                        move_list.append(i)
-            if d2c ==4 and d2s ==1:
-                if d2 == 1:
-                    if self.board[i+5*(self.NS-1)] == 0:
-                        move_list.append(i+5*(self.NS-1))
-                        move_list.append(i)
-                elif d2 == -1:
-                    if self.board[i-5*(self.NS-1)] == 0:
-                        move_list.append(i-5*(self.NS-1))
-                        move_list.append(i)
-
-            if rowc ==4 and rows == 2:
-                move_list.append(i)
-            if colc ==4 and cols == 2:
-                move_list.append(i)
-            if d1c ==4 and d1s == 2:
-                move_list.append(i)
-            if d2c ==4 and d2s ==2:
-                move_list.append(i)
-
-            if rowc ==4 and rows == 2 and rd == 0:
-                move_list.append(rs1)
-                move_list.append(rs2)
-            if colc ==4 and cols == 2 and cd == 0:
-                move_list.append(cs1)
-                move_list.append(cs2)
-            if d1c ==4 and d1s == 2 and d1 == 0:
-                move_list.append(ds1)
-                move_list.append(ds2)
-            if d2c ==4 and d2s ==2 and d2 == 0:
-                move_list.append(d21)
-                move_list.append(d22)
-
-        move_list = list(set(move_list))
-
-        return move_list
+        own, opp = self._own_and_opponent_bb()
+        return where_bits(self._block_four_points(opp))
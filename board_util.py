@@ -26,9 +26,11 @@ def is_black_white_empty(color):
 
 """
 A GO_POINT is a point on a Go board.
-It is encoded as a 32-bit integer, using the numpy type.
+It holds one of the colors above, so it is encoded as an 8-bit integer,
+using the numpy type. The small type keeps whole-board comparisons
+such as board == EMPTY cheap.
 """
-GO_POINT = np.int32
+GO_POINT = np.int8
 
 """
 Encoding of special pass move
@@ -58,6 +60,20 @@ def where1d(condition):
     return np.where(condition)[0]
 
 
+"""
+where_bits: the bitboard counterpart of where1d.
+Returns the indices of the set bits of the integer bb,
+in increasing order.
+"""
+def where_bits(bb):
+    points = []
+    while bb:
+        low = bb & -bb
+        points.append(low.bit_length() - 1)
+        bb ^= low
+    return points
+
+
 def coord_to_point(row, col, boardsize):
     """
     Transform two dimensional (row, col) representation to array index.
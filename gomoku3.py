@@ -3,8 +3,11 @@
 # Set the path to your python3 above
 
 from gtp_connection import GtpConnection
-from board_util import GoBoardUtil
+from board_util import GoBoardUtil, EMPTY
 from board import GoBoard
+from gomoku_kernel import HAVE_NUMBA, rollout, batch_rollouts
+from collections import OrderedDict
+import numpy as np
 import random
 
 
@@ -24,10 +27,30 @@ class Gomoku():
         self.name = "GomokuAssignment3"
         self.version = 1.0
         self.NN = 10
+        # get_order results by position, least recently used first
+        self.order_cache = OrderedDict()
+        self.order_cache_size = 10000
 
     def get_move(self, board, color):
         return GoBoardUtil.generate_random_move(board, color)
     def get_order(self,board,color):
+        """
+        Moves of the best rule that applies for board.current_player.
+        The result only depends on the position, so it is cached by the
+        stones on the board (the bitboards) and the player to move.
+        The returned list is shared and must not be modified.
+        """
+        key = (board.size, board.black_bb, board.white_bb,
+               board.current_player)
+        if key in self.order_cache:
+            self.order_cache.move_to_end(key)
+            return self.order_cache[key]
+        move_list = self._get_order(board)
+        self.order_cache[key] = move_list
+        if len(self.order_cache) > self.order_cache_size:
+            self.order_cache.popitem(last=False)
+        return move_list
+    def _get_order(self,board):
         move_list = board.Win()
         if move_list != []:
             return move_list
@@ -48,63 +71,97 @@ class Gomoku():
         if policy == "random":
 
             legal_moves = board.get_empty_points()
-            score = [0]*len(legal_moves)
+            if not HAVE_NUMBA:
+                score = self.batch_simulation(board, color, legal_moves)
+                return legal_moves[int(np.argmax(score))]
+            score = np.zeros(len(legal_moves), dtype=np.int32)
             for i in range(len(legal_moves)):
-                temp = board.copy()
                 move = legal_moves[i]
 
                 for j in range(self.NN):
-                    temp.play_move(move,color)
-                    win = self.sim_for_one(temp,color)
+                    if not board.play_move(move,color):
+                        continue
+                    win = self.sim_for_one(board,color)
+                    board.undo_move()
                     if win == 1:
                         score[i] += 1
-                score[i] = score[i]/self.NN
-            bestIndex = score.index(max(score))
-            best = legal_moves[bestIndex]
+            # the number of wins orders the moves like the win rate does
+            best = legal_moves[int(np.argmax(score))]
             return best
         elif policy == "rule_based":
             legal_moves = self.get_order(board, color)
-            score = [0]*len(legal_moves)
+            score = np.zeros(len(legal_moves), dtype=np.int32)
             for i in range(len(legal_moves)):
-                temp = board.copy()
                 move = legal_moves[i]
 
                 for j in range(self.NN):
-                    temp.play_move(move,color)
-                    win = self.sim_for_one_rule(temp,color)
+                    if not board.play_move(move,color):
+                        continue
+                    win = self.sim_for_one_rule(board,color)
+                    board.undo_move()
                     if win == 1:
                         score[i] += 1
-                score[i] = score[i]/self.NN
-            bestIndex = score.index(max(score))
-            best = legal_moves[bestIndex]
+            # the number of wins orders the moves like the win rate does
+            best = legal_moves[int(np.argmax(score))]
             return best
 
 
-    def sim_for_one(self,board,color):
+    def batch_simulation(self, board, color, legal_moves):
+        """
+        Number of wins for color in NN random playouts after each of
+        legal_moves, with all playouts run side by side in NumPy.
+        """
+        result = board.detect_five_in_a_row()
+        if result != EMPTY:
+            wins = self.NN if result == color else 0
+            return np.full(len(legal_moves), wins, dtype=np.int32)
+        return batch_rollouts(board.board, board.NS, legal_moves,
+                              self.NN, color)
 
+    def sim_for_one(self,board,color):
+        """
+        Play random moves until the game ends, then take them all back.
+        Returns 1 if color wins, -1 if it loses and 0 for a draw.
+        The playout is gomoku_kernel.rollout, compiled if numba is
+        installed. Without numba, simulation uses batch_simulation
+        instead, and rollout still works here as plain Python.
+        """
         result = board.detect_five_in_a_row()
         if result == color:
             return 1
         elif result == GoBoardUtil.opponent(color):
             return -1
-        moves = GoBoardUtil.generate_random_move(board,board.current_player)
-        if moves == None:
-            return 0
-        board.play_move(move,board.current_player)
-        return self.sim_for_one(board,color)
+        empties = board.get_empty_points().astype(np.int32)
+        seed = np.uint64(random.getrandbits(63) | 1)
+        return rollout(board.board, board.NS, empties,
+                       board.current_player, color, seed)
     def sim_for_one_rule(self,board,color):
-
+        """
+        Same as sim_for_one, but moves are chosen from get_order.
+        """
+        opponent = GoBoardUtil.opponent(color)
+        detect_five_around = board.detect_five_around
+        get_order = self.get_order
+        choice = random.choice
+        play_move = board.play_move
+        depth = 0
         result = board.detect_five_in_a_row()
+        while result == EMPTY:
+            moves = get_order(board,board.current_player)
+            if moves == None:
+                break
+            move = choice(moves)
+            if play_move(move,board.current_player):
+                depth += 1
+                result = detect_five_around(move)
+        undo_move = board.undo_move
+        for _ in range(depth):
+            undo_move()
         if result == color:
             return 1
-        elif result == GoBoardUtil.opponent(color):
+        elif result == opponent:
             return -1
-        moves = self.get_order(board,board.current_player)
-        if moves == None:
-            return 0
-        move = random.choice(moves)
-        board.play_move(move,board.current_player)
-        return self.sim_for_one_rule(board,color)
+        return 0
 
 
 
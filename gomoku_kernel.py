@@ -0,0 +1,165 @@
+"""
+gomoku_kernel.py
+
+Fast random playouts for Gomoku.
+The functions work directly on the 1-dimensional board array of
+GoBoard (see board_util.coord_to_point for the encoding).
+rollout and its helpers are compiled with numba when it is installed.
+Without numba, HAVE_NUMBA is False, and batch_rollouts runs many
+playouts side by side with NumPy instead.
+"""
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+from board_util import BLACK, WHITE, EMPTY
+
+try:
+    from numba import njit
+    HAVE_NUMBA = True
+except ImportError:
+    HAVE_NUMBA = False
+
+    def njit(*args, **kwargs):
+        def decorator(function):
+            return function
+        return decorator
+
+
+@njit(cache=True)
+def xorshift(state):
+    """
+    One step of the xorshift64 random number generator.
+    state is a non-zero np.uint64
+    """
+    state ^= state << np.uint64(13)
+    state ^= state >> np.uint64(7)
+    state ^= state << np.uint64(17)
+    return state
+
+
+@njit(cache=True)
+def five_through(board, point, color, NS):
+    """
+    Check whether the stone of color on point is part of five in a row.
+    The BORDER points around the board stop every scan.
+    """
+    for d in (1, NS, NS + 1, NS - 1):
+        count = 1
+        p = point + d
+        while board[p] == color:
+            count += 1
+            p += d
+        p = point - d
+        while board[p] == color:
+            count += 1
+            p -= d
+        if count >= 5:
+            return True
+    return False
+
+
+@njit(cache=True)
+def rollout(board, NS, empties, current_player, color, seed):
+    """
+    Play random moves on the points in empties until one player gets
+    five in a row or the board is full, then clear the stones again.
+    board must not contain five in a row yet.
+
+    Arguments
+    ---------
+    board: the board array, restored when the playout is done
+    NS: the row stride of board
+    empties: int32 array of the empty points, reordered in place
+    current_player: the color to move first
+    color: the color the result is computed for
+    seed: non-zero np.uint64 seed of the random number generator
+
+    Returns
+    -------
+    1 if color wins, -1 if it loses and 0 for a draw
+    """
+    n = empties.shape[0]
+    state = seed
+    player = current_player
+    result = 0
+    played = 0
+    while played < n:
+        state = xorshift(state)
+        k = played + np.int64(state % np.uint64(n - played))
+        point = empties[k]
+        empties[k] = empties[played]
+        empties[played] = point
+        board[point] = player
+        played += 1
+        if five_through(board, point, player, NS):
+            if player == color:
+                result = 1
+            else:
+                result = -1
+            break
+        player = WHITE + BLACK - player
+    for i in range(played):
+        board[empties[i]] = EMPTY
+    return result
+
+
+def batch_rollouts(board, NS, moves, n, color):
+    """
+    Play n random playouts after each of the moves, all in lockstep.
+    Row r of a (len(moves) * n, len(board)) array holds playout r, and
+    every step plays a random move in all unfinished rows at once.
+    board must not contain five in a row yet.
+
+    Arguments
+    ---------
+    board: the board array, not modified
+    NS: the row stride of board
+    moves: the points color can play first
+    n: the number of playouts for each move
+    color: the color that plays the moves
+
+    Returns
+    -------
+    int array with the number of playouts color won after each move
+    """
+    moves = np.asarray(moves, dtype=np.intp)
+    boards = np.tile(board, (len(moves) * n, 1))
+    rows = np.arange(boards.shape[0])
+    points = np.repeat(moves, n)
+    # offsets[j, k] is the point k - 4 steps away in direction j
+    offsets = (np.array([1, NS, NS + 1, NS - 1])[:, None]
+               * np.arange(-4, 5)[None, :])
+    player = color
+    winner = np.full(boards.shape[0], EMPTY, dtype=board.dtype)
+    while True:
+        boards[rows, points] = player
+        won = _fives_through(boards, rows, points, player, offsets)
+        winner[rows[won]] = player
+        rows = rows[~won]
+        if rows.size == 0:
+            break
+        player = WHITE + BLACK - player
+        keys = np.random.random((rows.size, boards.shape[1]))
+        keys[boards[rows] != EMPTY] = -1.0
+        points = keys.argmax(axis=1)
+        # rows without an empty point left are draws
+        open_rows = keys[np.arange(rows.size), points] >= 0.0
+        rows = rows[open_rows]
+        points = points[open_rows]
+        if rows.size == 0:
+            break
+    return (winner == color).reshape(len(moves), n).sum(axis=1)
+
+
+def _fives_through(boards, rows, points, player, offsets):
+    """
+    For each r, check whether the stone of player on points[r] in
+    boards[rows[r]] is part of five in a row.
+    """
+    cells = points[:, None, None] + offsets[None, :, :]
+    # Points past either end of the array are replaced by the first or
+    # last point, which are BORDER like everything just outside the board.
+    np.clip(cells, 0, boards.shape[1] - 1, out=cells)
+    same = boards[rows[:, None, None], cells] == player
+    # every window of five of the nine points contains the center point
+    return sliding_window_view(same, 5, axis=2).all(axis=3).any(axis=(1, 2))